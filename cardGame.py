@@ -1,9 +1,12 @@
 from __future__ import annotations
 import random
+from collections import Counter
+from collections.abc import Mapping
+from copy import deepcopy
 from abc import ABC, abstractmethod
 from enum import Enum, auto
-from dataclasses import dataclass
-from typing import Optional, Any
+from dataclasses import dataclass, replace
+from typing import Any, Callable, NamedTuple, Optional
 from time import sleep
 
 
@@ -21,8 +24,8 @@ class ActionType(Enum):
     RESPOND = auto()
 
 
-@dataclass(frozen=True)
-class Action:
+class Action(NamedTuple):
+    # A tuple: built for every legal option, so it must be cheap to create
     type: ActionType
     acting_player: Player
     target_player: Optional[Player] = None
@@ -45,7 +48,78 @@ class Observation:
     own_hand: list[str]
     open_hands: bool
     other_hands: Optional[list[list[str]]] = None
-    extras: Optional[dict[str, Any]] = None
+    extras: Optional[Mapping[str, Any]] = None
+
+    def snapshot(self) -> Observation:
+        """A copy that stays valid after the game moves on.
+
+        Game.get_observation reuses one Observation, so copy.copy() is not
+        enough: the lists and the extras would still be the game's own.
+        """
+        return replace(
+            self,
+            scores=list(self.scores),
+            is_done=list(self.is_done),
+            own_hand=None if self.own_hand is None else list(self.own_hand),
+            other_hands=(
+                None
+                if self.other_hands is None
+                else [list(h) for h in self.other_hands]
+            ),
+            extras=None if self.extras is None else dict(self.extras.items()),
+        )
+
+
+class LazyExtras(Mapping):
+    """Observation extras that are only computed when they are read.
+
+    Every key has a function that computes its value from the current game
+    state. A value is computed on its first read and kept until `clear()`,
+    so strategies only pay for the extras they actually look at.
+
+    It is a read-only mapping that always holds every key: iterating, len(),
+    items() and so on go through the producers. It is not a dict, because
+    it reads live game state. copy() and deepcopy() return a plain dict of
+    the current values instead.
+    """
+
+    def __init__(self, producers: dict[str, Callable[[], Any]]):
+        self._producers = producers
+        self._values: dict[str, Any] = {}
+
+    def __getitem__(self, key):
+        values = self._values
+        if key in values:
+            return values[key]
+        value = values[key] = self._producers[key]()
+        return value
+
+    def __iter__(self):
+        return iter(self._producers)
+
+    def __len__(self):
+        return len(self._producers)
+
+    def __contains__(self, key):
+        return key in self._producers
+
+    def get(self, key, default=None):
+        return self[key] if key in self._producers else default
+
+    def clear(self):
+        """Forget the computed values; call whenever the game state changes."""
+        self._values.clear()
+
+    def copy(self) -> dict[str, Any]:
+        return dict(self.items())
+
+    __copy__ = copy
+
+    def __deepcopy__(self, memo) -> dict[str, Any]:
+        return {k: deepcopy(v, memo) for k, v in self.items()}
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.copy()!r})"
 
 
 class Strategy(ABC):
@@ -54,8 +128,14 @@ class Strategy(ABC):
     Concrete implementations can represent human input (via a UI layer),
     simple bots, or learning-based agents. They receive an Observation
     and a list of legal Actions and must return one of those actions.
+
+    Strategies that never look at the observation can set
+    `needs_observation = False`; the game then passes None instead of
+    building one.
     """
 
+    needs_observation: bool = True
+
     @abstractmethod
     def choose_action(
         self, observation: Observation, legal_actions: list[Action]
@@ -65,52 +145,127 @@ class Strategy(ABC):
 class RandomStrategy(Strategy):
     """Simple strategy that selects uniformly at random among legal actions."""
 
+    needs_observation = False
+
+    def __init__(self, seed=None):
+        super().__init__()
+        self.rng = random.Random(seed)
+
     def choose_action(
         self, observation: Observation, legal_actions: list[Action]
     ) -> Action:
         if not legal_actions:
             raise ValueError("RandomStrategy requires at least one legal action.")
-        return random.choice(legal_actions)
+        return self.rng.choice(legal_actions)
 
 
 class Card:
     # In this script (making Flip7) we don't use suit
-    def __init__(self, value, suit=None):
+    # Cards are created by the hundred every round, so keep them compact:
+    # fixed slots instead of a per-instance __dict__.
+    __slots__ = ("value", "suit", "special", "number", "_str", "_hash")
+
+    def __init__(self, value, suit=None, special=None):
         self.value = str(value)
         self.suit = suit
-        # Usefull tag (True, False for example)
-        self.special = None
-        self.owner: Player = None
+        # Usefull tag (True, False for example). Set once here: pooled cards
+        # are shared by every deck and hand, so it must never change.
+        self.special = special
+        # The value as an int, parsed once since scores and matches are
+        # worked out on ints (None for cards like "Freeze")
+        try:
+            self.number: Optional[int] = int(self.value)
+        except ValueError:
+            self.number = None
+        # Cards never change value, so their text and hash are worked out once
+        self._str = self.value if suit is None else self.value + suit
+        self._hash = hash((self.value, self.suit))
+
+    @classmethod
+    def get(cls, value, suit=None, special=None) -> Card:
+        """Return the shared instance for this value, suit and special tag.
+
+        Cards carry no per-copy state (who holds a card is tracked by the
+        Hand it is in), so every copy in a deck can be the same object.
+        """
+        key = (str(value), suit, special)
+        card = _CARD_POOL.get(key)
+        if card is None:
+            card = _CARD_POOL[key] = cls(value, suit, special)
+            _CARD_LOOKUP.setdefault(key[:2], card)
+        return card
+
+    @classmethod
+    def coerce(cls, card) -> Card:
+        """Turn a plain value (e.g. "Freeze" or 5) into a Card equal to it.
+
+        Only reads the pool, so looking values up never grows it.
+        """
+        if isinstance(card, Card):
+            return card
+        found = _CARD_LOOKUP.get((str(card), None))
+        return cls(card) if found is None else found
 
     def __int__(self):
         return int(self.value)
 
     def __str__(self):
-        if self.suit is None:
-            return self.value
-        else:
-            return self.value + self.suit
+        return self._str
 
     def __hash__(self):
-        return str(self).__hash__()
+        return self._hash
 
     __repr__ = __str__
 
     def __eq__(self, card):
+        if self is card:
+            return True
         if not isinstance(card, Card):
-            card = Card(card)
-
+            return NotImplemented
         return self.value == card.value and self.suit == card.suit
 
 
+_CARD_POOL: dict[tuple[str, Optional[str], Optional[bool]], Card] = {}
+# A pooled card per (value, suit), whatever its special tag. Cards compare
+# by value and suit only, so any of them will do for a lookup.
+_CARD_LOOKUP: dict[tuple[str, Optional[str]], Card] = {}
+
+
 class Deck(list[Card]):
+    # The deck keeps a tally of each card, so counting and membership tests
+    # (asked for every bust probability) need no scan. All changes must go
+    # through append/extend/pop/remove/clear; swapping cards around is fine.
+    def __init__(self, cards=()):
+        super().__init__(cards)
+        self._counts: Counter[Card] = Counter(self)
+
+    def append(self, card):
+        super().append(card)
+        self._counts[card] += 1
+
+    def extend(self, cards):
+        for c in cards:
+            self.append(c)
+
+    def pop(self, i=-1):
+        card = super().pop(i)
+        self._counts[card] -= 1
+        return card
+
+    def clear(self):
+        super().clear()
+        self._counts.clear()
+
     @property
     def nrCards(self):
         return len(self)
 
-    def addCard(self, card, copies=1):
+    def addCard(self, card, copies=1, special=None):
         if not isinstance(card, Card):
-            card = Card(card)
+            card = Card.get(card, special=special)
+        elif special is not None and card.special != special:
+            # Shared cards are never retagged; use the pooled variant instead
+            card = Card.get(card.value, card.suit, special)
         for _ in range(copies):
             self.append(card)
 
@@ -118,32 +273,61 @@ class Deck(list[Card]):
         for v in cards:
             self.addCard(v)
 
-    def peekRandomCards(self, nr=1):
+    # The random functions take an optional `rng` (e.g. a game's
+    # random.Random) and fall back to the module-level generator.
+    def peekRandomCards(self, nr=1, rng=random):
         assert nr >= 1
         if self.nrCards == 0:
             return None
-        return random.sample(self, nr)
+        # Sample positions rather than cards, so cards are never hashed.
+        return [self[i] for i in rng.sample(range(len(self)), nr)]
 
-    def peekRandomCard(self):
-        return self.peekRandomCards(1)[0]
+    def peekRandomCard(self, rng=random):
+        return self.peekRandomCards(1, rng)[0]
 
-    def takeRandomCards(self, nr=1):
-        # Take cards without removing
-        cards = self.peekRandomCards(nr)
-        if cards is None:
+    def takeRandomCards(self, nr=1, rng=random):
+        assert nr >= 1
+        if self.nrCards == 0:
             return None
-        # Remove cards taken
-        for c in cards:
-            self.remove(c)
-        return cards
+        # Partial Fisher-Yates: each pick is swapped to the end and popped,
+        # so no card comparisons or list shifting are needed.
+        return [
+            self._take_index(rng.randrange(len(self)))
+            for _ in range(min(nr, len(self)))
+        ]
+
+    def takeRandomCard(self, rng=random):
+        # The hot draw path: _take_index is inlined, and the index comes from
+        # random() directly, which skips randrange's argument checking.
+        i = int(rng.random() * len(self))
+        self[i], self[-1] = self[-1], self[i]
+        card = list.pop(self)
+        self._counts[card] -= 1
+        return card
+
+    def _take_index(self, i):
+        # O(1) removal; the order of the remaining cards does not matter.
+        self[i], self[-1] = self[-1], self[i]
+        return self.pop()
+
+    # Plain values are accepted wherever a card is looked up
+    def remove(self, card):
+        card = Card.coerce(card)
+        super().remove(card)
+        self._counts[card] -= 1
 
-    def takeRandomCard(self):
-        return self.takeRandomCards(1)[0]
+    def count(self, card):
+        return self._counts[Card.coerce(card)]
 
-    def remove(self, card):
-        if not isinstance(card, Card):
-            card = Card(card)
-        return super().remove(card)
+    def __contains__(self, card):
+        return self._counts[Card.coerce(card)] > 0
+
+    def copy(self):
+        # list.copy would hand back a plain list without the tally
+        deck = Deck()
+        list.extend(deck, self)
+        deck._counts = self._counts.copy()
+        return deck
 
     def getNormalCards(self):
         return [c for c in self if not c.special]
@@ -167,6 +351,17 @@ class Player:
 
         self.cpu = False  #
 
+        # The draw/pass decision comes up every turn; reuse these actions
+        self.drawAction = Action(ActionType.DRAW, acting_player=self)
+        self.passAction = Action(ActionType.PASS, acting_player=self)
+        # Choosing each player (by index); filled in by the game once all
+        # players exist
+        self.chooseActions: list[Action] = []
+
+        # Neighbours in the game's ring of players still in the round
+        self.nextActive: Player = None
+        self.prevActive: Player = None
+
     @property
     def i(self) -> int:
         """Stable index of the player within the game."""
@@ -174,10 +369,10 @@ class Player:
             raise ValueError("Player index has not been assigned.")
         return self._index
 
-    def drawCard(self, deck: Deck):
-        newCard = deck.takeRandomCard()
-        newCard.owner = self
-        self.hand.addCard(newCard)
+    def drawCard(self, deck: Deck, rng=random):
+        newCard = deck.takeRandomCard(rng)
+        # Cards from a deck are already Cards, so skip addCard's coercion
+        self.hand.append(newCard)
         return newCard
 
     def emptyHand(self):
@@ -191,16 +386,135 @@ class Player:
 class Hand(Deck):
     # A hand is basically just a tiny deck. Many of the same functions
     # for a deck is usefull for a deck as well. (addCard, takeCard, ...)
+    #
+    # Normal/special cards are asked for on every draw, so a hand keeps them
+    # partitioned as cards come and go. (A deck does not: keeping partitions
+    # in sync would turn its O(1) swap-pop draws into scans.) All changes
+    # must go through append/extend/pop/remove/clear.
+    #
+    # For numbered normal cards the hand also tracks which numbers it holds
+    # as a bitmask (bit v set <=> a card with value v is in the hand), how
+    # many there are and their sum, plus the sum of numbered special cards
+    # (e.g. "+4"). Cards without a number (e.g. "A") are only partitioned.
     def __init__(self, owner: Player = None):
         super().__init__()
         self.owner: Player = owner
+        self._normal: list[Card] = []
+        self._special: list[Card] = []
+        self.valueMask = 0
+        self.nrNumbers = 0
+        self.normalSum = 0
+        self.specialSum = 0
+        # str() of every card, for observations; None when it needs a rebuild
+        self._strings: Optional[list[str]] = []
+
+    def _partition(self, card: Card) -> list[Card]:
+        return self._special if card.special else self._normal
+
+    def append(self, card):
+        super().append(card)
+        if self._strings is not None:
+            self._strings.append(str(card))
+        if card.special:
+            self._special.append(card)
+            if card.number is not None:
+                self.specialSum += card.number
+        else:
+            self._normal.append(card)
+            v = card.number
+            if v is not None:
+                self.valueMask |= 1 << v
+                self.nrNumbers += 1
+                self.normalSum += v
+
+    def _forget(self, card: Card):
+        self._strings = None
+        self._partition(card).remove(card)
+        if card.special:
+            if card.number is not None:
+                self.specialSum -= card.number
+        elif card.number is not None:
+            self.nrNumbers -= 1
+            self.normalSum -= card.number
+            # Another copy may still be in the hand, so rebuild the mask
+            self.valueMask = 0
+            for c in self._normal:
+                if c.number is not None:
+                    self.valueMask |= 1 << c.number
+
+    def pop(self, i=-1):
+        card = super().pop(i)
+        self._forget(card)
+        return card
+
+    def takeRandomCard(self, rng=random):
+        # Deck's inlined draw bypasses pop(), which keeps the partitions in sync
+        return self._take_index(int(rng.random() * len(self)))
+
+    def remove(self, card):
+        # Forget the card actually held: a looked-up value is only equal to
+        # it and may not carry the same special tag
+        self.pop(self.index(Card.coerce(card)))
+
+    def clear(self):
+        super().clear()
+        self._normal.clear()
+        self._special.clear()
+        self.valueMask = 0
+        self.nrNumbers = 0
+        self.normalSum = 0
+        self.specialSum = 0
+        self._strings = []
+
+    def cardStrings(self) -> list[str]:
+        """The hand as strings, cached between changes. Do not modify it."""
+        if self._strings is None:
+            self._strings = [str(c) for c in self]
+        return self._strings
+
+    def hasDuplicateValue(self) -> bool:
+        # Each distinct number sets one bit, so a duplicate leaves fewer bits
+        return self.nrNumbers != self.valueMask.bit_count()
+
+    def hasValue(self, v: int) -> bool:
+        return bool((self.valueMask >> v) & 1)
+
+    # These return the hand's own partitions: read them, don't modify them.
+    def getNormalCards(self):
+        return self._normal
+
+    def getSpecialCards(self):
+        return self._special
+
+
+def _noop(*args, **kwargs):
+    pass
 
 
 class Game(ABC):
-    def __init__(self, playerNames):
+    # Games can use their own Player subclass
+    playerClass = Player
+
+    def __init__(self, playerNames, headless=False, seed=None):
+        # All game randomness goes through this generator, so a seeded game
+        # is reproducible and independent of other games in the process.
+        self.rng = random.Random(seed)
         self.deck = self.newDeck()
+        # Every round starts from the same deck, so keep a copy to reset from
+        self._deckTemplate: Deck = self.deck.copy()
         self.nrPlayers = len(playerNames)
-        self.players = [Player(n, i) for i, n in enumerate(playerNames)]
+        self.players = [self.playerClass(n, i) for i, n in enumerate(playerNames)]
+        for p in self.players:
+            p.chooseActions = [
+                Action(ActionType.CHOOSE_PLAYER, acting_player=p, target_player=t)
+                for t in self.players
+            ]
+        # Kept in sync by markDone/resetPlayers so the queries below are O(1)
+        self._nrPlayersDone = 0
+        self._playersNotDone: tuple[Player, ...] = tuple(self.players)
+        self._linkActivePlayers()
+        # Index of the highest scoring player, kept up to date by addScore
+        self._leaderIndex = 0
         self.turnPlayer: Player = self.players[0]  # Player whos turn it is
         # Active player (p2 might need to make an action during p1's turn)
         self.activePlayer: Player = self.players[0]
@@ -215,24 +529,65 @@ class Game(ABC):
         self.coloredWords = None
         self.showLog = True
 
+        # Reused by get_observation instead of allocating one per action
+        self._observation = Observation(
+            actingPlayer=None,
+            turnPlayer=None,
+            leadingPlayer=None,
+            nr_players_still_playing=self.nrPlayers,
+            phase=None,
+            round=self.round,
+            scores=[],
+            is_done=[],
+            deck_size=len(self.deck),
+            own_hand=None,
+            open_hands=self.openHands,
+        )
+
+        # Headless games (bot simulations) never print or sleep. Replacing the
+        # methods outright also skips the log() argument handling.
+        self.headless = headless
+        if headless:
+            self.showLog = False
+            self.log = _noop
+            self.wait = _noop
+
     @abstractmethod
     def newDeck(self) -> Deck: ...
 
     @property
     def nrPlayersDone(self) -> int:
-        return sum([p.isDone for p in self.players])
+        return self._nrPlayersDone
 
     @property
     def nrPlayersStillPlaying(self) -> int:
-        return len(self.players) - self.nrPlayersDone
+        return self.nrPlayers - self._nrPlayersDone
 
     @property
-    def playersNotDone(self) -> list[Player]:
-        return [p for p in self.players if not p.isDone]
+    def playersNotDone(self) -> tuple[Player, ...]:
+        return self._playersNotDone
 
     @property
     def everyoneIsDone(self) -> bool:
-        return len(self.playersNotDone) == 0
+        return self._nrPlayersDone == self.nrPlayers
+
+    def markDone(self, player: Player):
+        # The only place a player should become done during a round
+        if player.isDone:
+            return
+        player.isDone = True
+        self._nrPlayersDone += 1
+        self._playersNotDone = tuple(p for p in self._playersNotDone if p is not player)
+        # Splice the player out of the ring. Their own links are left as they
+        # are, so endTurn can still step forward from them.
+        player.prevActive.nextActive = player.nextActive
+        player.nextActive.prevActive = player.prevActive
+
+    def _linkActivePlayers(self):
+        # Circular doubly-linked list of the players in seating order
+        for p, nxt in zip(self.players, self.players[1:] + self.players[:1]):
+            p.nextActive = nxt
+            nxt.prevActive = p
 
     def get_observation(self, open_hands: bool = None) -> Observation:
         """Construct a generic Observation for the given player.
@@ -241,48 +596,70 @@ class Game(ABC):
         (for example, adding entries into `extras` such as effects to resolve),
         but this base implementation provides a sensible default view that is
         independent of any particular UI.
+
+        Every call returns the same Observation object and refills it in
+        place: its `scores` and `is_done` lists are overwritten, not replaced.
+        An observation is therefore only valid until the next call. That
+        suits strategies that decide synchronously; use `snapshot()` to keep
+        one around. Subclass overrides follow the same contract.
         """
         if open_hands is None:
             open_hands = self.openHands
 
-        scores = [p.score for p in self.players]
-        is_done = [p.isDone for p in self.players]
+        obs = self._observation
+        obs.scores[:] = [p.score for p in self.players]
+        obs.is_done[:] = [p.isDone for p in self.players]
         # The hand of the active player
         if self.activePlayer:
-            own_hand = [str(c) for c in self.activePlayer.hand]
+            own_hand = self.activePlayer.hand.cardStrings()
         else:
             own_hand = None
 
         other_hands: Optional[list[list[str]]]
         if open_hands:
             other_hands = [
-                [str(c) for c in p.hand] for p in self.players if p != self.activePlayer
+                p.hand.cardStrings() for p in self.players if p != self.activePlayer
             ]
         else:
             other_hands = None
 
-        return Observation(
-            actingPlayer=self.activePlayer,
-            turnPlayer=self.turnPlayer,
-            leadingPlayer=self.getLeader(),
-            nr_players_still_playing=self.nrPlayersStillPlaying,
-            phase=self.phase,
-            round=self.round,
-            scores=scores,
-            is_done=is_done,
-            deck_size=len(self.deck),
-            own_hand=own_hand,
-            open_hands=open_hands,
-            other_hands=other_hands,
-            extras=None,
-        )
+        obs.actingPlayer = self.activePlayer
+        obs.turnPlayer = self.turnPlayer
+        obs.leadingPlayer = self.getLeader()
+        obs.nr_players_still_playing = self.nrPlayersStillPlaying
+        obs.phase = self.phase
+        obs.round = self.round
+        obs.deck_size = len(self.deck)
+        obs.own_hand = own_hand
+        obs.open_hands = open_hands
+        obs.other_hands = other_hands
+        obs.extras = None
+        return obs
 
     def play(self):
-        self.allCPUs = all([p.cpu for p in self.players])
+        self.allCPUs = all(p.cpu for p in self.players)
         # Ensure every player has a strategy
         for p in self.players:
             assert p.strategy is not None, "Give the player a strategy!"
 
+    def restart(self, seed=None):
+        """Set up a new game with the same players and strategies.
+
+        Running many games in a row (bot simulations) this way is cheaper
+        than building a new Game for each one.
+        """
+        self.rng.seed(seed)
+        self.resetDeck()
+        self.resetPlayers()
+        for p in self.players:
+            p.score = 0
+        self._leaderIndex = 0
+        self.turnPlayer = self.players[0]
+        self.activePlayer = self.turnPlayer
+        self.round = 1
+        self.phase = None
+        self.gameOver = False
+
     def get_legal_actions(self, player: Player) -> list[Action]:
         """Return the list of legal actions for the given player.
 
@@ -311,18 +688,16 @@ class Game(ABC):
 
     def endTurn(self):
         # Redefines turn player so that it is the next (not-done) player's turn.
+        # If nobody is left, nothing changes.
         if self.everyoneIsDone:
             return
-
-        i = self.turnPlayer.i
-        for _ in range(len(self.players)):
-            i = (i + 1) % len(self.players)
-            if not self.players[i].isDone:
-                self.turnPlayer = self.players[i]
-                self.activePlayer = self.turnPlayer
-                return
-
-        # Fallback: if everyone became done unexpectedly
+        p = self.turnPlayer.nextActive
+        # Only happens when the turn player, and then the player they pointed
+        # to, dropped out of the ring: their links lead on to the next player
+        # still in the round.
+        while p.isDone:
+            p = p.nextActive
+        self.turnPlayer = p
         self.activePlayer = self.turnPlayer
 
     def endRound(self):
@@ -338,17 +713,34 @@ class Game(ABC):
         self.round += 1
 
     def getLeader(self, highestScore=True):
-        f = max if highestScore else min
-        return f(self.players, key=lambda p: p.score)
+        if highestScore:
+            return self.players[self._leaderIndex]
+        return min(self.players, key=lambda p: p.score)
+
+    def addScore(self, player: Player, points: int):
+        # Scores should only change through here so the leader stays cached.
+        player.score += points
+        if points < 0:
+            self._leaderIndex = max(self.players, key=lambda p: p.score).i
+            return
+        # Same tie-break as max(): the earliest player wins
+        leader = self.players[self._leaderIndex]
+        if player.score > leader.score or (
+            player.score == leader.score and player.i < leader.i
+        ):
+            self._leaderIndex = player.i
 
     def resetPlayers(self):
         for p in self.players:
             p.isDone = False
             p.status = None
             p.emptyHand()
+        self._nrPlayersDone = 0
+        self._playersNotDone = tuple(self.players)
+        self._linkActivePlayers()
 
     def resetDeck(self):
-        self.deck = self.newDeck()
+        self.deck = self._deckTemplate.copy()
 
     def showPlayerScores(self):
         self.log("Player scores:")
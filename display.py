@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import curses
-import io
+import functools
 import re
+from collections import deque
 from dataclasses import dataclass
 from typing import Optional
 
@@ -31,6 +32,29 @@ _SEMANTIC_COLORS: dict[str, str] = {
     "success": "green",
 }
 
+# Attribute bits are plain ints the curses module defines on import, so they
+# can be looked up once here rather than on every call.
+_STYLE_ATTRS: dict[str, int] = {
+    "bold": curses.A_BOLD,
+    "dim": curses.A_DIM,
+    "reverse": curses.A_REVERSE,
+    "underline": curses.A_UNDERLINE,
+}
+_A_COLOR = curses.A_COLOR
+_A_STYLE = ~curses.A_COLOR
+
+
+@functools.lru_cache(maxsize=64)
+def _highlight_pattern(words: tuple[str, ...]) -> re.Pattern[str]:
+    """Whole-word, case-insensitive alternation with group i <=> words[i].
+
+    Shared between displays, as every game of a session highlights the same
+    words.
+    """
+    return re.compile(
+        "|".join(rf"(\b{re.escape(w)}\b)" for w in words), re.IGNORECASE
+    )
+
 
 @dataclass
 class _Choice:
@@ -49,17 +73,47 @@ class CursesDisplay:
     keys when present, but falls back gracefully.
     """
 
+    FOOTER = "Keys: d=draw, p=pass, 1-9=choose target, q=quit"
+
     def __init__(self, game: Game):
         self.game: Game = game
+        # Games without hand scores just show the score
+        self._hand_score = getattr(game, "getPlayerHandScore", None)
         self._stdscr: Optional["curses._CursesWindow"] = None
+        # Screen (height, width) as of the current frame; see `render`.
+        self._size = (0, 0)
 
-        self._messages: list[tuple[str, int]] = []
         # Cap stored messages; the number *displayed* is computed from screen size.
         self._max_messages = 200
+        self._messages: deque[tuple[str, int]] = deque(maxlen=self._max_messages)
+        # Total messages ever pushed (the deque above is capped)
+        self._nr_pushed = 0
+
+        # What the last frame showed; see `render`.
+        self._last_render_key: Optional[tuple] = None
+        # Legal actions `_choices` was built for; see `_build_choices`.
+        self._choices_key: Optional[tuple[Action, ...]] = None
+        self._choices: list[_Choice] = []
+
+        # What each panel last showed, by panel name; see `render`.
+        self._panel_keys: dict[str, object] = {}
 
         # Per-word highlight rules for the on-screen log.
-        # Stored as (compiled_regex, color, style) in insertion order.
-        self._log_highlights: list[tuple[re.Pattern[str], object, object]] = []
+        # Stored as (word, color, style) in insertion order.
+        self._log_highlights: list[tuple[str, object, object]] = []
+        # All rules as one alternation (group i <=> rule i) and each rule's
+        # attr; built lazily, since colors need an active curses session.
+        self._highlight_rx: Optional[re.Pattern[str]] = None
+        self._highlight_attrs: list[int] = []
+        # Deletes every character a rule can start with; a line it leaves
+        # unchanged cannot contain a highlighted word.
+        self._highlight_firsts: dict[int, None] = {}
+        # Lines shorter than the shortest rule word cannot contain one either
+        self._highlight_min_len = 0
+        # msg -> its wrapped lines with their highlight spans, valid for
+        # one log width and one set of highlight rules.
+        self._wrap_cache: dict[str, list[tuple[str, list[tuple[int, int, int]]]]] = {}
+        self._wrap_width = -1
 
         # Overwrite functions
         game.log = self.curses_log
@@ -79,18 +133,18 @@ class CursesDisplay:
         w = (word or "").strip()
         if not w:
             return
-        rx = re.compile(rf"\b{re.escape(w)}\b", re.IGNORECASE)
-        self._log_highlights.append((rx, color, style))
+        self._log_highlights.append((w, color, style))
+        self._reset_highlights()
 
     def clear_log_highlights(self) -> None:
         self._log_highlights.clear()
+        self._reset_highlights()
 
     def push_message(self, msg: str, *, attr: int = 0) -> None:
         if msg.strip() == "":
             return
         self._messages.append((msg, attr))
-        if len(self._messages) > self._max_messages:
-            self._messages = self._messages[-self._max_messages :]
+        self._nr_pushed += 1
 
     def choose_action(
         self, obs: Observation = None, legal: list[Action] = None
@@ -115,7 +169,7 @@ class CursesDisplay:
 
             # Terminal resize counts as an input event → re-render.
             if ch == "<RESIZE>":
-                self.render(obs, legal)
+                self.render(obs, legal, force=True)
                 continue
 
             if ch in ("q", "Q"):
@@ -126,8 +180,16 @@ class CursesDisplay:
             if choice is not None:
                 return choice.action
 
-    def render(self, obs: Observation = None, legal: list[Action] = None) -> None:
-        """Render the current state without requiring input."""
+    def render(
+        self, obs: Observation = None, legal: list[Action] = None, *, force=False
+    ) -> None:
+        """Render the current state without requiring input.
+
+        Nothing is redrawn if the state shown is the same as in the last frame,
+        unless `force` is set. Every visible change to a hand, score or status
+        comes with a log message or a new deck size, so those stand in for the
+        full board.
+        """
         if legal is None:
             legal = self.game.get_legal_actions(self.game.activePlayer)
         if obs is None:
@@ -138,51 +200,108 @@ class CursesDisplay:
                 "CursesDisplay.render() called outside of an active curses session"
             )
 
-        self._stdscr.erase()
-
-        h, w = self._stdscr.getmaxyx()
+        # Read once per frame; the drawing helpers clip against this
+        h, w = self._size = self._stdscr.getmaxyx()
+
+        key = (
+            self._nr_pushed,
+            h,
+            w,
+            obs.round,
+            obs.phase,
+            obs.actingPlayer,
+            obs.deck_size,
+            tuple(legal),
+        )
+        if not force and key == self._last_render_key:
+            return
+        self._last_render_key = key
 
         # Layout columns
         left_w = max(40, min(w // 2, 70))
         right_x = left_w + 1
+        right_w = w - right_x - 1
+
+        # Each panel is only cleared and redrawn when what it shows changed.
+        panels = self._panel_keys
+        footer_dirty = False
+        if force or panels.get("size") != (h, w):
+            panels.clear()
+            panels["size"] = (h, w)
+            self._stdscr.erase()
+            self._hline(1, 0, w)
+            footer_dirty = True
 
         # Header
         header = self._build_header(obs)
-        self._addnstr(0, 0, header, w - 1, attr=curses.A_BOLD)
-        self._hline(1, 0, w)
+        if panels.get("header") != header:
+            panels["header"] = header
+            self._clear(0, 0, 1, w)
+            self._addnstr(0, 0, header, w - 1, attr=curses.A_BOLD)
 
         # Left: players and hands
-        y = 2
-        y = self._draw_players_panel(y, 0, left_w, obs)
+        bust_probs = obs.extras.get("bust_probabilities", None)
+        players_key = (
+            obs.actingPlayer,
+            tuple(bust_probs) if isinstance(bust_probs, list) else None,
+            tuple(
+                (p.status, p.score, tuple(p.hand.cardStrings()))
+                for p in self.game.players
+            ),
+        )
+        if panels.get("players") != players_key:
+            panels["players"] = players_key
+            # A long players list can run into the footer row, so clear that too
+            self._clear(2, 0, h - 2, right_x)
+            self._draw_players_panel(2, 0, left_w, obs)
+            footer_dirty = True
 
         # Right: actions + messages
-        ry = 2
-        ry = self._draw_actions_panel(ry, right_x, w - right_x - 1, obs, legal)
-        self._hline(ry + 1, right_x, w - right_x - 1)
+        extras = obs.extras
+        actions_key = (
+            tuple(legal),
+            tuple(extras.get("effects_to_resolve", ())),
+            tuple(extras.get("effect_owners", ())),
+            extras.get("pending_effect", None),
+            extras.get("pending_effect_owner", None),
+        )
+        if panels.get("actions") != actions_key:
+            panels["actions"] = actions_key
+            # The log sits below the actions, so it moves with them
+            panels.pop("log", None)
+            self._clear(2, right_x, h - 3, w - right_x)
+            ry = self._draw_actions_panel(2, right_x, right_w, obs, legal)
+            self._hline(ry + 1, right_x, right_w)
+            panels["actions_end"] = ry
 
         # Log panel height adapts to remaining space (accounts for Actions/Effects height).
-        log_y = ry + 2
-        log_w = w - right_x - 1
-        # Reserve the last row for the footer.
-        max_log_lines = max(0, (h - 2) - log_y + 1)
-        self._draw_messages_panel(log_y, right_x, log_w, max_lines=max_log_lines)
+        log_y = panels["actions_end"] + 2
+        if panels.get("log") != self._nr_pushed:
+            panels["log"] = self._nr_pushed
+            # Reserve the last row for the footer.
+            max_log_lines = max(0, (h - 2) - log_y + 1)
+            self._clear(log_y, right_x, max_log_lines, w - right_x)
+            self._draw_messages_panel(log_y, right_x, right_w, max_lines=max_log_lines)
 
         # Footer hint
-        footer = "Keys: d=draw, p=pass, 1-9=choose target, q=quit"
-        self._addnstr(h - 1, 0, footer, w - 1, attr=curses.A_DIM)
+        if footer_dirty:
+            self._addnstr(h - 1, 0, self.FOOTER, w - 1, attr=curses.A_DIM)
 
         self._stdscr.noutrefresh()
         curses.doupdate()
 
     def _build_attr(self, *, color=None, style=None) -> int:
+        if color is None and style is None:
+            # Plain log messages
+            return 0
+
         attr = 0
 
         # Apply color if curses is active.
         if color is not None and self._stdscr is not None and curses.has_colors():
             if isinstance(color, str):
-                name = _SEMANTIC_COLORS.get(
-                    color.strip().lower(), color.strip().lower()
-                )
+                name = color.strip().lower()
+                name = _SEMANTIC_COLORS.get(name, name)
                 pair_id = _COLOR_NAME_TO_PAIR_ID.get(name)
                 if pair_id is not None:
                     attr |= curses.color_pair(pair_id)
@@ -193,7 +312,10 @@ class CursesDisplay:
                     pass
 
         # Apply style attributes.
-        if style is not None:
+        if isinstance(style, str) and style in _STYLE_ATTRS:
+            # A single style name, as used by the highlight rules
+            attr |= _STYLE_ATTRS[style]
+        elif style is not None:
             if isinstance(style, str):
                 parts = [p.strip().lower() for p in style.split(",") if p.strip()]
             elif isinstance(style, (list, tuple, set)):
@@ -202,21 +324,16 @@ class CursesDisplay:
                 parts = [str(style).strip().lower()] if str(style).strip() else []
 
             for part in parts:
-                if part == "bold":
-                    attr |= curses.A_BOLD
-                elif part == "dim":
-                    attr |= curses.A_DIM
-                elif part == "reverse":
-                    attr |= curses.A_REVERSE
-                elif part == "underline":
-                    attr |= curses.A_UNDERLINE
+                attr |= _STYLE_ATTRS.get(part, 0)
 
         return attr
 
-    def curses_log(self, *args, color=None, style=None, **kwargs):
-        buf = io.StringIO()
-        print(*args, **kwargs, file=buf)
-        msg = buf.getvalue().rstrip("\n")
+    def curses_log(self, *args, color=None, style=None, sep=None, end=None, **kwargs):
+        # Same text print(*args, sep=sep, end=end) would write, minus the newline
+        msg = (" " if sep is None else sep).join(map(str, args))
+        if end is not None:
+            msg += end
+        msg = msg.rstrip("\n")
         if not msg:
             return
 
@@ -255,41 +372,57 @@ class CursesDisplay:
         Bitwise-OR of two color pairs is undefined in curses (it can yield a third
         pair, e.g. green|yellow -> blue). Styles are OR-ed normally.
         """
-        base_color = base_attr & curses.A_COLOR
-        base_style = base_attr & ~curses.A_COLOR
+        base_color = base_attr & _A_COLOR
+        base_style = base_attr & _A_STYLE
 
-        hl_color = hl_attr & curses.A_COLOR
-        hl_style = hl_attr & ~curses.A_COLOR
+        hl_color = hl_attr & _A_COLOR
+        hl_style = hl_attr & _A_STYLE
 
         color = hl_color if hl_color else base_color
         return base_style | hl_style | color
 
     def _highlight_spans(self, s: str) -> list[tuple[int, int, int]]:
-        """Return non-overlapping (start,end,hl_attr) spans. First-added wins."""
+        """Return non-overlapping (start,end,hl_attr) spans, in order.
+
+        All rules are matched in a single pass: the leftmost match wins, and
+        when several rules match at the same position the first-added wins.
+        """
         if not self._log_highlights:
             return []
 
-        taken: list[tuple[int, int]] = []
-        spans: list[tuple[int, int, int]] = []
-        for rx, color, style in self._log_highlights:
-            hl_attr = self._build_attr(color=color, style=style)
-            for m in rx.finditer(s):
-                a, b = m.span()
-                if a == b:
-                    continue
-                if any(not (b <= ta or a >= tb) for ta, tb in taken):
-                    continue
-                taken.append((a, b))
-                spans.append((a, b, hl_attr))
-        spans.sort(key=lambda t: t[0])
-        return spans
+        rx = self._highlight_rx
+        if rx is None:
+            rx = self._highlight_rx = _highlight_pattern(
+                tuple(w for w, _, _ in self._log_highlights)
+            )
+            self._highlight_attrs = [
+                self._build_attr(color=color, style=style)
+                for _, color, style in self._log_highlights
+            ]
+            firsts = "".join(w[0] for w, _, _ in self._log_highlights)
+            self._highlight_firsts = str.maketrans(
+                "", "", firsts.lower() + firsts.upper()
+            )
+            self._highlight_min_len = min(len(w) for w, _, _ in self._log_highlights)
+
+        if len(s) < self._highlight_min_len:
+            return []
+        if len(s.translate(self._highlight_firsts)) == len(s):
+            return []
+        attrs = self._highlight_attrs
+        return [(m.start(), m.end(), attrs[m.lastindex - 1]) for m in rx.finditer(s)]
+
+    def _reset_highlights(self) -> None:
+        self._highlight_rx = None
+        self._wrap_cache.clear()
 
     def _draw_highlighted_line(
-        self, y: int, x: int, s: str, width: int, base_attr: int = 0
+        self, y: int, x: int, s: str, width: int, base_attr: int = 0, spans=None
     ) -> None:
         if width <= 0:
             return
-        spans = self._highlight_spans(s)
+        if spans is None:
+            spans = self._highlight_spans(s)
         if not spans:
             self._addnstr(y, x, s, width, attr=base_attr)
             return
@@ -331,34 +464,47 @@ class CursesDisplay:
         return None
 
     def _build_choices(self, obs: Observation, legal: list[Action]) -> list[_Choice]:
-        # Prefer explicit mapping by action type.
+        # A render and the keypress after it ask for the same list
+        key = tuple(legal)
+        if key == self._choices_key:
+            return self._choices
+
+        # Prefer explicit mapping by action type; one pass sorts legal into
+        # the first DRAW, the first PASS, CHOOSE_PLAYER targets and the rest.
+        draw = pas = None
+        targets: list[Action] = []
+        extra: list[Action] = []
+        for a in legal:
+            t = a.type
+            if t is ActionType.DRAW and draw is None:
+                draw = a
+            elif t is ActionType.PASS and pas is None:
+                pas = a
+            elif t is ActionType.CHOOSE_PLAYER:
+                targets.append(a)
+            else:
+                extra.append(a)
+
         out: list[_Choice] = []
 
         # DRAW / PASS
-        draw = next((a for a in legal if a.type == ActionType.DRAW), None)
         if draw is not None:
             out.append(_Choice("d", "Draw", draw))
-
-        pas = next((a for a in legal if a.type == ActionType.PASS), None)
         if pas is not None:
             out.append(_Choice("p", "Pass", pas))
 
-        # CHOOSE_PLAYER targets
-        targets = [a for a in legal if a.type == ActionType.CHOOSE_PLAYER]
-        if targets:
-            # number keys 1..9
-            for i, a in enumerate(targets, start=1):
-                key = str(i)
-                label = f"Choose player {a.target_player}"
-                out.append(_Choice(key, label, a))
+        # CHOOSE_PLAYER targets: number keys 1..9
+        for i, a in enumerate(targets, start=1):
+            key_s = str(i)
+            label = f"Choose player {a.target_player}"
+            out.append(_Choice(key_s, label, a))
 
         # Fallback: enumerate any remaining legal actions
-        used = {id(c.action) for c in out}
-        extra = [a for a in legal if id(a) not in used]
         for i, a in enumerate(extra, start=1):
-            key = f"{i}"
-            out.append(_Choice(key, a.type, a))
+            out.append(_Choice(f"{i}", a.type, a))
 
+        self._choices_key = key
+        self._choices = out
         return out
 
     def _build_header(self, obs: Observation) -> str:
@@ -371,6 +517,7 @@ class CursesDisplay:
         bust_probs = obs.extras.get("bust_probabilities", None)
 
         players = self.game.players
+        handScore = self._hand_score
 
         self._addnstr(y, x, "Players", w - 1, attr=curses.A_BOLD)
         y += 1
@@ -395,8 +542,8 @@ class CursesDisplay:
                     prob_s = ""
 
             score = f"score={p.score}"
-            if hasattr(self.game, "getPlayerHandScore"):
-                score += f"+({self.game.getPlayerHandScore(p)})"
+            if handScore is not None:
+                score += f"+({handScore(p)})"
 
             line = f"{p.i + 1}: {p.name} {score}{prob_s}{flag_s}"
             attr = curses.A_REVERSE if is_acting else 0
@@ -479,48 +626,64 @@ class CursesDisplay:
             return
 
         # Build wrapped lines from newest to oldest until we fill the available space.
-        lines: list[tuple[str, int]] = []
-        for msg, attr in reversed(self._messages[-self._max_messages :]):
-            wrapped = self._wrap(msg, w - 1)
+        lines: list[tuple[str, list, int]] = []
+        for msg, attr in reversed(self._messages):
+            wrapped = self._wrapped(msg, w - 1)
             # Add in reverse so overall order becomes oldest->newest after final reverse.
-            for ln in reversed(wrapped):
-                lines.append((ln, attr))
+            for ln, spans in reversed(wrapped):
+                lines.append((ln, spans, attr))
                 if len(lines) >= max_lines:
                     break
             if len(lines) >= max_lines:
                 break
 
         # We collected lines newest-first; flip to display oldest->newest.
-        for ln, attr in reversed(lines):
-            self._draw_highlighted_line(y, x, ln, w - 1, base_attr=attr)
+        for ln, spans, attr in reversed(lines):
+            self._draw_highlighted_line(y, x, ln, w - 1, base_attr=attr, spans=spans)
             y += 1
 
+    def _wrapped(
+        self, msg: str, width: int
+    ) -> list[tuple[str, list[tuple[int, int, int]]]]:
+        """`_wrap` plus highlight spans per line, memoized per log width."""
+        cache = self._wrap_cache
+        if width != self._wrap_width or len(cache) > 2 * self._max_messages:
+            cache.clear()
+            self._wrap_width = width
+        wrapped = cache.get(msg)
+        if wrapped is None:
+            wrapped = [(ln, self._highlight_spans(ln)) for ln in self._wrap(msg, width)]
+            cache[msg] = wrapped
+        return wrapped
+
     def _wrap(self, s: str, width: int) -> list[str]:
         if not isinstance(s, str):
             s = str(s)
         if width <= 5:
             return [s[:width]]
 
-        words = s.split(" ")
+        # Greedy wrap on spaces. Lines are tracked as [start, end) indices into
+        # `s` and sliced out once, rather than built up word by word.
         lines: list[str] = []
-        cur = ""
-        for w in words:
-            if not cur:
-                cur = w
-                continue
-            if len(cur) + 1 + len(w) <= width:
-                cur += " " + w
-            else:
-                lines.append(cur)
-                cur = w
-        if cur:
-            lines.append(cur)
+        start = end = pos = 0
+        for word in s.split(" "):
+            word_end = pos + len(word)
+            if end == start:
+                # Empty line so far: it starts at this word
+                start = pos
+            elif word_end - start > width:
+                lines.append(s[start:end])
+                start = pos
+            end = word_end
+            pos = word_end + 1
+        if end > start:
+            lines.append(s[start:end])
         return lines
 
     def _addnstr(self, y: int, x: int, s: str, n: int, *, attr: int = 0) -> None:
         if self._stdscr is None:
             return
-        h, w = self._stdscr.getmaxyx()
+        h, w = self._size
         if y < 0 or y >= h:
             return
         if x < 0 or x >= w:
@@ -531,6 +694,20 @@ class CursesDisplay:
             # Happens when writing in the last column/row on some terminals.
             pass
 
+    def _clear(self, y: int, x: int, height: int, width: int) -> None:
+        """Blank a rectangle of the screen, clipped to the screen."""
+        if self._stdscr is None:
+            return
+        h, w = self._size
+        height = min(height, h - y)
+        width = min(width, w - x)
+        if height <= 0 or width <= 0:
+            return
+        try:
+            self._stdscr.derwin(height, width, y, x).erase()
+        except curses.error:
+            pass
+
     def _hline(self, y: int, x: int, width: int) -> None:
         if self._stdscr is None:
             return
@@ -562,6 +739,10 @@ class CursesDisplay:
         return CursesDisplay._Session(self)
 
     def _start_curses(self) -> None:
+        # Highlight attrs built before the session have no colors; rebuild them
+        self._reset_highlights()
+        self._last_render_key = None
+        self._panel_keys.clear()
         self._stdscr = curses.initscr()
         curses.noecho()
         curses.cbreak()
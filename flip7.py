@@ -1,4 +1,5 @@
 import sys
+from collections import deque
 from cardGame import (
     Game,
     Deck,
@@ -6,6 +7,7 @@ from cardGame import (
     Card,
     ActionType,
     Action,
+    LazyExtras,
     Observation,
     RandomStrategy,
     Strategy,
@@ -20,15 +22,25 @@ class Flip7(Game):
     SECOND_CHANCE = "Second-chance"
     TIMES_TWO = "x2"
 
-    EFFECTS = [FREEZE, FLIP_THREE]
+    EFFECTS = frozenset((FREEZE, FLIP_THREE))
+
+    # (value, copies, special) for every kind of card in a fresh deck
+    DECK = (
+        tuple((i, max(i, 1), False) for i in range(0, 13))
+        + ((FREEZE, 3, True), (FLIP_THREE, 3, True), (SECOND_CHANCE, 3, True))
+        + ((TIMES_TWO, 1, True),)
+        + tuple((f"+{2 * i}", 1, True) for i in range(1, 6))
+    )
 
     # Internal flow phases for the strategy-driven engine
     PHASE_FLIP = "Flip card"  # active player decides draw/pass
     PHASE_EFFECT_CHOOSE = "Choose effect target"  # effect owner chooses target player
 
-    def __init__(self, playerNames):
-        super().__init__(playerNames)
-        self.effectsToResolve: list[Card] = []
+    def __init__(self, playerNames, headless=False, seed=None):
+        super().__init__(playerNames, headless, seed)
+        # Queued effect cards together with the player who drew them. Effects
+        # of players who are out of the round stay queued and are skipped.
+        self.effectsToResolve: deque[tuple[Card, Player]] = deque()
         self.maxScore = 200  # First to reach 200 or more wins
         self.showBustChance = True
         # This game is played with open hands
@@ -39,6 +51,30 @@ class Flip7(Game):
         self._pending_effect: Card | None = None
         self._pending_effect_owner: Player | None = None
 
+        # Last result of activeBustProbability and the state it was for
+        self._bustDeck: Deck | None = None
+        self._bustKey: tuple | None = None
+        self._bustProbability = 0.0
+
+        # Extras of get_observation, each computed only if a strategy asks
+        self._extras = LazyExtras(
+            {
+                "hand_score": self._observedHandScore,
+                "bust_probability": self.activeBustProbability,
+                "bust_probabilities": self._observedBustProbabilities,
+                "effects_to_resolve": lambda: [
+                    str(c) for c, _ in self._liveEffects()
+                ],
+                "effect_owners": lambda: [o.i for _, o in self._liveEffects()],
+                "pending_effect": lambda: (
+                    str(self._pending_effect) if self._pending_effect else None
+                ),
+                "pending_effect_owner": lambda: (
+                    self._pending_effect_owner.i if self._pending_effect_owner else None
+                ),
+            }
+        )
+
         self.coloredWords = {
             Flip7.FREEZE: "cyan",
             "frozen": "cyan",
@@ -50,64 +86,50 @@ class Flip7(Game):
             "Flip7": "green",
         }
 
+    def restart(self, seed=None):
+        super().restart(seed)
+        self.effectsToResolve.clear()
+        self.phase = Flip7.PHASE_FLIP
+        self._pending_effect = None
+        self._pending_effect_owner = None
+
     def newDeck(self):
         deck = Deck()
-        # Add numbers
-        for i in range(0, 13):
-            deck.addCard(i, copies=max(i, 1))
-
-        for c in deck:
-            c.special = False
-
-        # Extra cards
-        deck.addCard(Flip7.FREEZE, 3)
-        deck.addCard(Flip7.FLIP_THREE, 3)
-        deck.addCard(Flip7.SECOND_CHANCE, 3)
-        deck.addCard(Flip7.TIMES_TWO)
-        for i in range(1, 6):
-            deck.addCard(f"+{2 * i}")
-
-        for c in deck:
-            if c.special is None:
-                c.special = True
-
+        for value, copies, special in Flip7.DECK:
+            deck.addCard(value, copies, special=special)
         return deck
 
     def get_observation(self) -> Observation:
+        """Game.get_observation plus the Flip7 extras.
+
+        Reuses the observation in the same way; see Game.get_observation for
+        how long the result stays valid.
+        """
         obs = super().get_observation()
+        # Like the observation itself, the extras are reused between calls
+        self._extras.clear()
+        obs.extras = self._extras
+        return obs
 
-        pending_effect = str(self._pending_effect) if self._pending_effect else None
-        pending_owner = (
-            self._pending_effect_owner.i if self._pending_effect_owner else None
-        )
+    def _liveEffects(self) -> list[tuple[Card, Player]]:
+        return [(c, o) for c, o in self.effectsToResolve if not o.isDone]
 
-        # bust_probabilities = [
-        #     Flip7.bustProbability(p, self.deck, self.nrPlayersStillPlaying)
-        #     for p in self.players
-        # ]
-        bust_probability = Flip7.bustProbability(
-            self.activePlayer, self.deck, self.nrPlayersStillPlaying
-        )
+    def _observedHandScore(self):
+        if self.activePlayer is None:
+            return None
+        return self.getPlayerHandScore(self.activePlayer)
 
-        handScore = (
-            self.getPlayerHandScore(self.activePlayer) if self.activePlayer else None
-        )
-
-        obs.extras = {
-            "hand_score": handScore,
-            "bust_probability": bust_probability,
-            "effects_to_resolve": [str(c) for c in self.effectsToResolve],
-            "effect_owners": [c.owner.i for c in self.effectsToResolve],
-            "pending_effect": pending_effect,
-            "pending_effect_owner": pending_owner,
-        }
-        return obs
+    def _observedBustProbabilities(self):
+        # Shown next to every player by the display
+        if self.showBustChance:
+            return self.bustProbabilities()
+        return None
 
     def get_legal_actions(self, player: Player) -> list[Action]:
         if player is None:
             return []
 
-        if all(p.isDone for p in self.players):
+        if self.everyoneIsDone:
             return []
 
         if player.isDone:
@@ -116,10 +138,7 @@ class Flip7(Game):
         if self.phase == Flip7.PHASE_FLIP:
             if player is not self.turnPlayer:
                 return []
-            return [
-                Action(ActionType.DRAW, acting_player=player),
-                Action(ActionType.PASS, acting_player=player),
-            ]
+            return [player.drawAction, player.passAction]
 
         if self.phase == Flip7.PHASE_EFFECT_CHOOSE:
             if (
@@ -128,12 +147,8 @@ class Flip7(Game):
             ):
                 return []
 
-            targets = [p for p in self.players if not p.isDone]
-
-            return [
-                Action(ActionType.CHOOSE_PLAYER, acting_player=player, target_player=t)
-                for t in targets
-            ]
+            choices = player.chooseActions
+            return [choices[t.i] for t in self.playersNotDone]
 
         return []
 
@@ -196,30 +211,33 @@ class Flip7(Game):
 
     def _start_next_effect_if_any(self) -> None:
         """Pop the next effect and switch to EFFECT_CHOOSE; or return to TURN when queue is empty."""
-        if not self.effectsToResolve:
+        queue = self.effectsToResolve
+        while queue and queue[0][1].isDone:
+            queue.popleft()
+        if not queue:
             self._pending_effect = None
             self._pending_effect_owner = None
             self.phase = Flip7.PHASE_FLIP
             self.activePlayer = self.turnPlayer
             return
 
-        effect = self.effectsToResolve.pop(0)
+        effect, owner = queue.popleft()
         self._pending_effect = effect
-        self._pending_effect_owner = effect.owner
+        self._pending_effect_owner = owner
         self.phase = Flip7.PHASE_EFFECT_CHOOSE
 
         # During effect resolution, the effect owner becomes the active player.
         self.activePlayer = self._pending_effect_owner
 
     def _end_round_for(self, player: Player) -> None:
-        player.isDone = True
-        self.effectsToResolve = [c for c in self.effectsToResolve if c.owner != player]
+        # Their queued effects are dropped by _start_next_effect_if_any
+        self.markDone(player)
 
     def _apply_draw(self, player: Player, three_turn: bool = False) -> Card:
         """Draw 1 card; queue effects; optionally resolve immediately."""
         assert not player.isDone
 
-        new_card = player.drawCard(self.deck)
+        new_card = player.drawCard(self.deck, self.rng)
 
         self.log(player, "draws a", new_card)
 
@@ -243,8 +261,8 @@ class Flip7(Game):
             return new_card
 
         # Effects
-        elif not player.isDone and new_card in Flip7.EFFECTS:
-            self.effectsToResolve.append(new_card)
+        elif not player.isDone and new_card.value in Flip7.EFFECTS:
+            self.effectsToResolve.append((new_card, player))
             if not three_turn:
                 self._start_next_effect_if_any()
 
@@ -262,14 +280,40 @@ class Flip7(Game):
         self._start_next_effect_if_any()
 
     def playerHasMatch(self, player: Player, newCard=None):
-        onlyNumbersHand = player.hand.getNormalCards()
+        hand = player.hand
+        if hand.hasDuplicateValue():
+            return True
+        # Would the (not yet drawn) new card match a number in the hand?
+        return (
+            newCard is not None
+            and not newCard.special
+            and hand.hasValue(newCard.number)
+        )
 
-        if newCard is not None:
-            if not newCard.special:
-                onlyNumbersHand.append(newCard)
+    def activeBustProbability(self) -> float:
+        """bustProbability for the active player, reused until the state changes.
 
-        # Check if there are any matches by converting to set
-        return len(onlyNumbersHand) != len(set(onlyNumbersHand))
+        Within a round hands only change when a card leaves the deck, and
+        every round starts from a new deck, so the deck and its size stand in
+        for the hands.
+        """
+        key = (self.activePlayer, len(self.deck), self.nrPlayersStillPlaying)
+        if self._bustDeck is not self.deck or key != self._bustKey:
+            self._bustDeck = self.deck
+            self._bustKey = key
+            self._bustProbability = Flip7.bustProbability(
+                self.activePlayer, self.deck, self.nrPlayersStillPlaying
+            )
+        return self._bustProbability
+
+    def bustProbabilities(self) -> list[float]:
+        """bustProbability for every player.
+
+        The deck keeps a tally of its cards, so each player costs a lookup per
+        number in their hand rather than a walk over the deck.
+        """
+        n = self.nrPlayersStillPlaying
+        return [Flip7.bustProbability(p, self.deck, n) for p in self.players]
 
     @staticmethod
     def matchProbability(player: Player, deck: Deck):
@@ -277,45 +321,51 @@ class Flip7(Game):
         Probability that the very next card is a number that matches
         a number already in the player's hand.
         """
-        hand = {c for c in player.hand.getNormalCards()}
-        if not hand or len(deck) == 0:
+        if len(deck) == 0:
             return 0.0
+        return Flip7.matchingCards(player, deck) / len(deck)
 
-        matching_in_deck = sum(
-            1 for card in deck if (not card.special and card in hand)
-        )
-        return matching_in_deck / len(deck)
+    @staticmethod
+    def matchingCards(player: Player, deck: Deck) -> int:
+        """Number of cards in the deck matching a number in the player's hand."""
+        # The deck tallies its cards, so this never looks at the deck itself
+        return sum(deck.count(card) for card in set(player.hand.getNormalCards()))
 
     @staticmethod
     def bustProbability(player: Player, deck: Deck, nrPlayersStillPlaying=2):
+        # Nothing left to draw (or nobody to draw it) means no risk
+        if player is None or len(deck) == 0:
+            return 0.0
         # If the player has a second chance and can choose someone else
         # if they draw a flip three, their chance of busting is 0
-        if player is None:
-            return 0.0
         if Flip7.SECOND_CHANCE in player.hand:
             if nrPlayersStillPlaying != 1:
                 return 0.0
             else:
                 directMatchProbability = 0.0
+                matching = None
         else:
-            # Probability of drawing a card with a number already in the hand
-            directMatchProbability = Flip7.matchProbability(player, deck)
+            # Probability of drawing a card with a number already in the hand.
+            # The deck can't be empty here, and the count is reused below.
+            matching = Flip7.matchingCards(player, deck)
+            directMatchProbability = matching / len(deck)
 
         # Special case:
         # If there is only one player left, they would be forced to
         # pick themselves as a flip-three target, so we also factor in
         # the chance of busting via a flip-three chain.
         if Flip7.FLIP_THREE in deck and nrPlayersStillPlaying == 1:
-            matchByFlipThree = Flip7.matchByFlipThreeProbability(player, deck)
+            matchByFlipThree = Flip7.matchByFlipThreeProbability(
+                player, deck, matching
+            )
         else:
             matchByFlipThree = 0.0
 
         return directMatchProbability + matchByFlipThree
 
     @staticmethod
-    def matchByFlipThreeProbability(player: Player, deck: Deck):
-        # To not modify the original deck, we copy it
-        deck = deck.copy()
+    def matchByFlipThreeProbability(player: Player, deck: Deck, matching=None):
+        # matching is matchingCards(player, deck), if the caller already has it
 
         # First we see what the probability of getting a flip three is
         nrFlipThree = deck.count(Flip7.FLIP_THREE)
@@ -327,13 +377,19 @@ class Flip7(Game):
             "Don't call this function if the deck doesn't have a flip three"
         )
 
-        # Once we draw the flip three, that card leaves the deck
-        deck.remove(Flip7.FLIP_THREE)
+        # Once we draw the flip three, that card leaves the deck. It is not a
+        # number, so that only shrinks the deck; no copy is needed.
+        nrCardsLeft = len(deck) - 1
 
         # Approximate the probability of getting matches in the three
         # cards drawn due to the flip three. We treat the three draws as
         # (approximately) independent, using the single-draw probability.
-        p_single = Flip7.matchProbability(player, deck)
+        if nrCardsLeft == 0:
+            p_single = 0.0
+        else:
+            if matching is None:
+                matching = Flip7.matchingCards(player, deck)
+            p_single = matching / nrCardsLeft
         q_single = 1 - p_single
 
         # For each second chance in the hand, we need one additional match
@@ -350,15 +406,16 @@ class Flip7(Game):
             # You can't bust in three cards if you have 3 or more lives
             p_match_in_three = 0.0
         else:
+            # Plain products: float ** is slower than multiplying it out
             if L == 0:
                 # P(X >= 1) = 1 - (1 - p)^3
-                p_match_in_three = 1 - q_single**3
+                p_match_in_three = 1 - q_single * q_single * q_single
             elif L == 1:
-                # P(X >= 2) = 3 p^2 (1-p) + p^3
-                p_match_in_three = 3 * (p_single**2) * q_single + p_single**3
+                # P(X >= 2) = 3 p^2 (1-p) + p^3 = p^2 (3 (1-p) + p)
+                p_match_in_three = p_single * p_single * (3 * q_single + p_single)
             else:  # L == 2
                 # P(X >= 3) = p^3
-                p_match_in_three = p_single**3
+                p_match_in_three = p_single * p_single * p_single
 
         # It's only an approximation since, in reality, the draws
         # would not be independent. We also ignore the chance of
@@ -371,14 +428,12 @@ class Flip7(Game):
         if self.playerHasMatch(player):
             return 0
         else:
-            score = 0
-            if len(player.hand.getNormalCards()) == 7:
+            hand = player.hand
+            # Numbers plus the "+N" bonuses (the only numbered special cards)
+            score = hand.normalSum + hand.specialSum
+            if len(hand.getNormalCards()) == 7:
                 score += 15
-
-            for c in player.hand:
-                if not c.special or "+" in c.value:
-                    score += int(c)
-            if Flip7.TIMES_TWO in player.hand:
+            if Flip7.TIMES_TWO in hand:
                 score *= 2
             return score
 
@@ -386,7 +441,7 @@ class Flip7(Game):
         for p in self.players:
             handScore = self.getPlayerHandScore(p)
             self.log(p, "gets", handScore, "points")
-            p.score += handScore
+            self.addScore(p, handScore)
             p.emptyHand()
 
     def play(self):
@@ -397,10 +452,11 @@ class Flip7(Game):
         self._pending_effect_owner = None
 
         while not self.gameOver:
-            if not all(p.isDone for p in self.players):
-                obs = self.get_observation()
+            if not self.everyoneIsDone:
+                strategy = self.activePlayer.strategy
+                obs = self.get_observation() if strategy.needs_observation else None
                 legal = self.get_legal_actions(self.activePlayer)
-                chosen = self.activePlayer.strategy.choose_action(obs, legal)
+                chosen = strategy.choose_action(obs, legal)
                 self.apply_action(chosen)
                 if self.gameOver:
                     break
@@ -417,11 +473,13 @@ class Flip7(Game):
                 self.updatePlayerScores()
                 self.wait()
                 self.endRound()
+                self.effectsToResolve.clear()
                 self.phase = Flip7.PHASE_FLIP
                 self._pending_effect = None
                 self._pending_effect_owner = None
 
-                if any(p.score >= self.maxScore for p in self.players):
+                # The leader is cached, so this needs no pass over the players
+                if self.getLeader().score >= self.maxScore:
                     self.isDone = True
                     break
 
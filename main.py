@@ -1,4 +1,5 @@
 import sys
+import random
 from concurrent.futures import ProcessPoolExecutor, as_completed
 from flip7 import Flip7, simpleRisk, simpleRiskEstimator
 from display import CursesDisplay, HumanCursesStrategy
@@ -25,33 +26,45 @@ def humanPlayers(player_names):
         ui.waitForKey()
 
 
-def cpuPlayers(nrCpus=5, log=False):
-    game = Flip7(["Accurate", "Estimate"])
-    game.showLog = False
+CPU_NAMES = ["Accurate", "Estimate"]
+
+
+def _cpuGame(seed=None):
+    game = Flip7(CPU_NAMES, headless=True, seed=seed)
     game.players[0].strategy = simpleRisk(0.25)
     game.players[1].strategy = simpleRiskEstimator(30)
     for p in game.players:
         p.cpu = True
+    return game
+
 
-    winner = game.play()
+def cpuPlayers(nrCpus=5, log=False, seed=None):
+    winner = _cpuGame(seed).play()
     return winner
 
 
-def _run_games_batch(n: int):
-    """Run `n` CPU games in this process and return (n, Counter(winners))."""
-    local = Counter()
-    for _ in range(n):
-        local[cpuPlayers().name] += 1
-    return n, local
+def _run_games_batch(n: int, seed=None):
+    """Run `n` CPU games in this process and return (n, wins).
+
+    `wins[i]` is the number of games won by player i (see CPU_NAMES).
 
+    Every game gets its own seed drawn from the batch seed, so a run is
+    reproducible regardless of which worker picks up which batch.
+    """
+    seeder = random.Random(seed)
+    wins = [0] * len(CPU_NAMES)
+    # One game is set up per batch and restarted for each new game
+    game = _cpuGame()
+    for _ in range(n):
+        game.restart(seeder.getrandbits(64))
+        wins[game.play().i] += 1
+    return n, wins
 
-def playLotsOfGames():
-    nrGames = 100000
-    workers = 7
 
+def playLotsOfGames(nrGames=100000, workers=None, chunk_size=1000, seed=None):
+    # workers=None uses one process per CPU core.
     # Smaller chunks -> more frequent progress updates.
-    # Tune this: smaller = smoother progress but slightly more overhead.
-    chunk_size = 1000
+    # Tune chunk_size: smaller = smoother progress but slightly more overhead.
 
     # Build chunk sizes that sum to nrGames.
     chunks = [chunk_size] * (nrGames // chunk_size)
@@ -59,20 +72,25 @@ def playLotsOfGames():
     if tail:
         chunks.append(tail)
 
-    results = Counter()
+    wins = [0] * len(CPU_NAMES)
     completed_games = 0
 
     with ProcessPoolExecutor(max_workers=workers) as ex:
-        futures = [ex.submit(_run_games_batch, n) for n in chunks]
+        # Derive one seed per batch from the run seed
+        seeder = random.Random(seed)
+        futures = [
+            ex.submit(_run_games_batch, n, seeder.getrandbits(64)) for n in chunks
+        ]
 
         for fut in as_completed(futures):
-            n, c = fut.result()
-            results += c
+            n, batch_wins = fut.result()
+            for i, w in enumerate(batch_wins):
+                wins[i] += w
             completed_games += n
             print(f"{completed_games / nrGames:.0%}", end="\r")
 
     print("100%")
-    print(results)
+    print(Counter(dict(zip(CPU_NAMES, wins))))
 
 
 if __name__ == "__main__":
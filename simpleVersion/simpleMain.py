@@ -1,4 +1,5 @@
-from cardGame import Game, Deck, Player, Card, Colors
+from collections import deque
+from simpleVersion.simpleCardGame import Game, Deck, Player, Card, Colors
 
 
 class Flip7(Game):
@@ -7,39 +8,32 @@ class Flip7(Game):
     SECOND_CHANCE = f"{Colors.RED}Second chance{Colors.RESET}"
     TIMES_TWO = "x2"  # unchanged
 
-    EFFECTS = [FREEZE, FLIP_THREE]
+    EFFECTS = frozenset((FREEZE, FLIP_THREE))
 
-    def __init__(self, playerNames):
-        super().__init__(playerNames)
-        self.effectsToResolve: list[Card] = []
+    # (value, copies, special) for every kind of card in a fresh deck
+    DECK = (
+        tuple((i, max(i, 1), False) for i in range(0, 13))
+        + ((FREEZE, 3, True), (FLIP_THREE, 3, True), (SECOND_CHANCE, 3, True))
+        + ((TIMES_TWO, 1, True),)
+        + tuple((f"+{2 * i}", 1, True) for i in range(1, 6))
+    )
+
+    def __init__(self, playerNames, headless=False, seed=None):
+        super().__init__(playerNames, headless, seed)
+        # Queued effect cards together with the player who drew them
+        self.effectsToResolve: deque[tuple[Card, Player]] = deque()
         self.maxScore = 200  # First to reach 200 or more wins
         self.showProbability = True
 
     def newDeck(self):
         deck = Deck()
-        # Add numbers
-        for i in range(0, 13):
-            deck.addCard(i, copies=max(i, 1))
-
-        for c in deck:
-            c.special = False
-
-        # Extra cards
-        deck.addCard(Flip7.FREEZE, 3)
-        deck.addCard(Flip7.FLIP_THREE, 3)
-        deck.addCard(Flip7.SECOND_CHANCE, 3)
-        deck.addCard(Flip7.TIMES_TWO)
-        for i in range(1, 6):
-            deck.addCard(f"+{2 * i}")
-
-        for c in deck:
-            if c.special is None:
-                c.special = True
-
+        for value, copies, special in Flip7.DECK:
+            deck.addCard(value, copies, special=special)
         return deck
 
     def doTurn(self, player: Player, threeTurn=False):
-        if self.showProbability:
+        # Nobody reads the bust chance in a headless game
+        if self.showProbability and not self.headless:
             bustChance = f" ({round(self.matchProbability(player, self.deck) * 100)}%)"
         else:
             bustChance = ""
@@ -55,11 +49,13 @@ class Flip7(Game):
             answer = self.input("Take another card? (y/n): ").lower()
 
         if answer != "y":
+            # Done players are skipped from now on, so say it once here
+            self.log(f"{player} passes")
             self.endRoundFor(player)
             return
 
         # Else:
-        newCard = player.drawCard(self.deck)
+        newCard = player.drawCard(self.deck, self.rng)
         self.log(player.hand)
 
         # There is a match!
@@ -79,19 +75,17 @@ class Flip7(Game):
             self.endRoundFor(player)
 
         # There is an effect card
-        elif newCard in Flip7.EFFECTS:
+        elif newCard.value in Flip7.EFFECTS:
             # When resolving a flip three, we apply effects
             # afterwards if the player has not busted
             if threeTurn:
-                self.effectsToResolve.append(newCard)
+                self.effectsToResolve.append((newCard, player))
             else:
-                self.resolveEffect(newCard)
+                self.resolveEffect(newCard, player)
 
     def endRoundFor(self, player: Player):
-        player.isDone = True
-        # We remove the effects belonging to the player
-        # who is out of the round
-        self.effectsToResolve = [c for c in self.effectsToResolve if c.owner != player]
+        # Their queued effects are skipped by doTrippleTurn
+        self.markDone(player)
         self.log("The round is over for", player, color=Colors.MAGENTA)
 
     def doTrippleTurn(self, player: Player):
@@ -104,16 +98,18 @@ class Flip7(Game):
         if not player.isDone:
             self.log(player, "survived the flip three!", color=Colors.GREEN)
 
-        while len(self.effectsToResolve) > 0:
-            effectCard = self.effectsToResolve.pop(0)
-            self.resolveEffect(effectCard)
+        while self.effectsToResolve:
+            effectCard, owner = self.effectsToResolve.popleft()
+            # Effects of players who are out of the round are dropped
+            if not owner.isDone:
+                self.resolveEffect(effectCard, owner)
 
-    def resolveEffect(self, effectCard: Card):
+    def resolveEffect(self, effectCard: Card, owner: Player):
         self.tabLevel += 1
         self.log("Resolving", effectCard)
 
         # Card owner chooses a player
-        player = self.choosePlayer(effectCard.owner)
+        player = self.choosePlayer(owner)
 
         if effectCard.value == Flip7.FREEZE:
             self.log(player, "is frozen!", color=Colors.BLUE)
@@ -126,30 +122,34 @@ class Flip7(Game):
         self.tabLevel -= 1
 
     def playerHasMatch(self, player: Player, newCard=None):
-        onlyNumbersHand = player.hand.getNormalCards()
-
-        if newCard is not None:
-            if not newCard.special:
-                onlyNumbersHand.append(newCard)
-
-        # Check if there are any matches by converting to set
-        return len(onlyNumbersHand) != len(set(onlyNumbersHand))
+        hand = player.hand
+        if hand.hasDuplicateValue():
+            return True
+        # Would the (not yet drawn) new card match a number in the hand?
+        return (
+            newCard is not None
+            and not newCard.special
+            and hand.hasValue(newCard.number)
+        )
 
     def directMatchProbability(self, player: Player, deck: Deck):
         """
         Probability that the very next card is a number that matches
         a number already in the player's hand.
         """
-        hand = {c for c in player.hand.getNormalCards()}
-        if not hand or len(deck) == 0:
+        if len(deck) == 0:
             return 0.0
+        return self.matchingCards(player, deck) / len(deck)
 
-        matching_in_deck = sum(
-            1 for card in deck if (not card.special and card in hand)
-        )
-        return matching_in_deck / len(deck)
+    def matchingCards(self, player: Player, deck: Deck):
+        """Number of cards in the deck matching a number in the player's hand."""
+        # The deck tallies its cards, so this never looks at the deck itself
+        return sum(deck.count(card) for card in set(player.hand.getNormalCards()))
 
     def matchProbability(self, player: Player, deck: Deck):
+        # Nothing left to draw means no risk
+        if len(deck) == 0:
+            return 0.0
         # If the player has a second chance and can choose someone else
         # if they draw a flip three, their chance of busting is 0
         if Flip7.SECOND_CHANCE in player.hand:
@@ -157,24 +157,28 @@ class Flip7(Game):
                 return 0.0
             else:
                 directMatchProbability = 0.0
+                matching = None
         else:
-            # Probability of drawing a card with a number already in the hand
-            directMatchProbability = self.directMatchProbability(player, deck)
+            # Probability of drawing a card with a number already in the hand.
+            # The deck can't be empty here, and the count is reused below.
+            matching = self.matchingCards(player, deck)
+            directMatchProbability = matching / len(deck)
 
         # Special case:
         # If there is only one player left, they would be forced to
         # pick themselves as a flip-three target, so we also factor in
         # the chance of busting via a flip-three chain.
         if Flip7.FLIP_THREE in deck and self.nrPlayersStillPlaying == 1:
-            matchByFlipThree = self.matchByFlipThreeProbability(player, deck)
+            matchByFlipThree = self.matchByFlipThreeProbability(
+                player, deck, matching
+            )
         else:
             matchByFlipThree = 0.0
 
         return directMatchProbability + matchByFlipThree
 
-    def matchByFlipThreeProbability(self, player: Player, deck: Deck):
-        # To not modify the original deck, we copy it
-        deck = deck.copy()
+    def matchByFlipThreeProbability(self, player: Player, deck: Deck, matching=None):
+        # matching is matchingCards(player, deck), if the caller already has it
 
         # First we see what the probability of getting a flip three is
         nrFlipThree = deck.count(Flip7.FLIP_THREE)
@@ -186,13 +190,19 @@ class Flip7(Game):
             "Don't call this function if the deck doesn't have a flip three"
         )
 
-        # Once we draw the flip three, that card leaves the deck
-        deck.remove(Flip7.FLIP_THREE)
+        # Once we draw the flip three, that card leaves the deck. It is not a
+        # number, so that only shrinks the deck; no copy is needed.
+        nrCardsLeft = len(deck) - 1
 
         # Approximate the probability of getting matches in the three
         # cards drawn due to the flip three. We treat the three draws as
         # (approximately) independent, using the single-draw probability.
-        p_single = self.directMatchProbability(player, deck)
+        if nrCardsLeft == 0:
+            p_single = 0.0
+        else:
+            if matching is None:
+                matching = self.matchingCards(player, deck)
+            p_single = matching / nrCardsLeft
         q_single = 1 - p_single
 
         # For each second chance in the hand, we need one additional match
@@ -209,15 +219,16 @@ class Flip7(Game):
             # You can't bust in three cards if you have 3 or more lives
             p_match_in_three = 0.0
         else:
+            # Plain products: float ** is slower than multiplying it out
             if L == 0:
                 # P(X >= 1) = 1 - (1 - p)^3
-                p_match_in_three = 1 - q_single**3
+                p_match_in_three = 1 - q_single * q_single * q_single
             elif L == 1:
-                # P(X >= 2) = 3 p^2 (1-p) + p^3
-                p_match_in_three = 3 * (p_single**2) * q_single + p_single**3
+                # P(X >= 2) = 3 p^2 (1-p) + p^3 = p^2 (3 (1-p) + p)
+                p_match_in_three = p_single * p_single * (3 * q_single + p_single)
             else:  # L == 2
                 # P(X >= 3) = p^3
-                p_match_in_three = p_single**3
+                p_match_in_three = p_single * p_single * p_single
 
         # It's only an approximation since, in reality, the draws
         # would not be independent. We also ignore the chance of
@@ -235,33 +246,31 @@ class Flip7(Game):
                 score += 15
 
             for c in player.hand:
-                if not c.special or "+" in c.value:
-                    score += int(c)
-                if c.value == Flip7.TIMES_TWO:
+                # Numbers and "+N" cards are the only cards with a number
+                if c.number is not None:
+                    score += c.number
+                elif c.value == Flip7.TIMES_TWO:
                     score *= 2
             return score
 
     def updatePlayerScores(self):
         for p in self.players:
-            p.score += self.getPlayerHandScore(p)
+            self.addScore(p, self.getPlayerHandScore(p))
 
     def play(self):
         self.log("Game start!", color=Colors.MAGENTA)
         while not self.gameOver:
-            if not all([p.isDone for p in self.players]):
-                p = self.currentPlayer
-                if p.isDone:
-                    self.log(f"{p} passes")
-                else:
-                    self.doTurn(p)
-                    self.log()
-
+            if not self.everyoneIsDone:
+                # endTurn skips done players, so this one is still playing
+                self.doTurn(self.currentPlayer)
+                self.log()
                 self.endTurn()
 
             else:
                 self.updatePlayerScores()
 
-                if any([p.score >= self.maxScore for p in self.players]):
+                # The leader is cached, so this needs no pass over the players
+                if self.getLeader().score >= self.maxScore:
                     self.isDone = True
                     break
 
@@ -0,0 +1,92 @@
+import dataclasses
+import unittest
+
+from cardGame import Card, Hand, LazyExtras, Observation
+
+
+def numbered_hand(*values):
+    hand = Hand()
+    for v in values:
+        hand.addCard(v, special=False)
+    return hand
+
+
+class HandTest(unittest.TestCase):
+    def test_cards_without_a_number(self):
+        hand = numbered_hand(3, 5)
+        hand.append(Card.get("x2", special=True))
+        hand.append(Card("A"))
+
+        self.assertEqual(len(hand), 4)
+        self.assertEqual(hand.normalSum, 8)
+        self.assertEqual(hand.specialSum, 0)
+        self.assertFalse(hand.hasDuplicateValue())
+
+        hand.append(Card("A"))
+        self.assertFalse(hand.hasDuplicateValue())
+        hand.remove("A")
+        hand.remove("x2")
+        self.assertEqual(hand.normalSum, 8)
+        self.assertTrue(hand.hasValue(3) and hand.hasValue(5))
+
+    def test_take_random_card(self):
+        hand = numbered_hand(3, 5, 7)
+        card = hand.takeRandomCard()
+
+        self.assertEqual(len(hand), 2)
+        self.assertNotIn(card, hand)
+        self.assertEqual(len(hand.getNormalCards()), 2)
+        self.assertEqual(hand.nrNumbers, 2)
+        self.assertEqual(hand.normalSum, 15 - card.number)
+        self.assertFalse(hand.hasValue(card.number))
+        self.assertEqual(hand.cardStrings(), [str(c) for c in hand])
+
+        hand.takeRandomCards(2)
+        self.assertEqual((len(hand), hand.normalSum, hand.valueMask), (0, 0, 0))
+
+
+class LazyExtrasTest(unittest.TestCase):
+    def test_behaves_like_a_mapping(self):
+        calls = []
+        extras = LazyExtras({"a": lambda: calls.append("a") or 1, "b": lambda: 2})
+
+        self.assertEqual(calls, [])
+        self.assertEqual(len(extras), 2)
+        self.assertEqual(dict(extras), {"a": 1, "b": 2})
+        self.assertEqual(extras.get("c", 3), 3)
+        extras["a"]
+        self.assertEqual(calls, ["a"])
+        extras.clear()
+        self.assertEqual(extras.copy(), {"a": 1, "b": 2})
+        self.assertEqual(calls, ["a", "a"])
+
+    def test_asdict(self):
+        obs = Observation(
+            None, None, None, 2, None, 1, [0, 0], [False, False], 10, [], False
+        )
+        obs.extras = LazyExtras({"hand_score": lambda: 17})
+        self.assertEqual(dataclasses.asdict(obs)["extras"], {"hand_score": 17})
+
+
+class ObservationTest(unittest.TestCase):
+    def test_snapshot_outlives_the_game(self):
+        hand = numbered_hand(3, 5)
+        obs = Observation(
+            None, None, None, 2, None, 1, [0, 0], [False, False], 10, [], False
+        )
+        obs.own_hand = hand.cardStrings()
+        obs.extras = LazyExtras({"hand_score": lambda: hand.normalSum})
+        snap = obs.snapshot()
+
+        hand.addCard(9, special=False)
+        obs.scores[0] = 8
+        obs.extras.clear()
+
+        self.assertEqual(snap.scores, [0, 0])
+        self.assertEqual(snap.own_hand, ["3", "5"])
+        self.assertEqual(snap.extras, {"hand_score": 8})
+        self.assertEqual(obs.extras["hand_score"], 17)
+
+
+if __name__ == "__main__":
+    unittest.main()